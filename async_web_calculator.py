@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from calculator import CalculatorError, evaluate
+from web_calculator import HTML_PATH
+
+
+_HTML_BYTES: bytes | None = HTML_PATH.read_bytes() if HTML_PATH.exists() else None
+
+# evaluate() is short, pure CPU; a bounded pool keeps the event loop free
+# without paying a fresh OS thread per connection like ThreadingHTTPServer.
+_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
+
+def _cors_block(origin: str | None) -> bytes:
+    return (
+        f"Access-Control-Allow-Origin: {origin or '*'}\r\n"
+        "Vary: Origin\r\n"
+        "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+        "Access-Control-Allow-Headers: Content-Type\r\n"
+    ).encode("latin-1")
+
+
+def _response(
+    status: HTTPStatus,
+    body: bytes = b"",
+    content_type: str | None = None,
+    extra: bytes = b"",
+) -> bytes:
+    head = f"HTTP/1.1 {status.value} {status.phrase}\r\n".encode("latin-1")
+    if content_type is not None:
+        head += f"Content-Type: {content_type}\r\n".encode("latin-1")
+    head += f"Content-Length: {len(body)}\r\n".encode("latin-1")
+    return head + extra + b"\r\n" + body
+
+
+def _json_response(status: HTTPStatus, payload: dict, origin: str | None) -> bytes:
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return _response(
+        status, data, "application/json; charset=utf-8", _cors_block(origin)
+    )
+
+
+def _extract_expr(content_type: str, raw: bytes) -> str | None:
+    if content_type == "application/json":
+        try:
+            obj = json.loads(raw.decode("utf-8") if raw else "{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        if isinstance(obj, dict):
+            value = obj.get("expr")
+            if isinstance(value, str):
+                return value
+    elif content_type == "application/x-www-form-urlencoded":
+        parsed = urllib.parse.parse_qs(raw.decode("utf-8"), keep_blank_values=True)
+        value = parsed.get("expr", [None])[0]
+        if isinstance(value, str):
+            return value
+    return None
+
+
+def _parse_headers(block: bytes) -> dict[str, str]:
+    # One pass over the raw header block into a plain lowercased dict; far
+    # cheaper than the email.message.Message that BytesHeaderParser builds,
+    # and lookups below become plain dict hits instead of case-insensitive
+    # linear scans.
+    headers: dict[str, str] = {}
+    for line in block.decode("latin-1").split("\r\n"):
+        key, sep, value = line.partition(":")
+        if sep:
+            headers[key.strip().lower()] = value.strip()
+    return headers
+
+
+async def _dispatch(method: str, path: str, headers: dict[str, str], raw: bytes) -> bytes:
+    origin = headers.get("origin")
+
+    if path.startswith("/api/"):
+        if method == "OPTIONS":
+            return _response(HTTPStatus.NO_CONTENT, extra=_cors_block(origin))
+        if method == "GET" and path == "/api/health":
+            return _json_response(HTTPStatus.OK, {"ok": True}, origin)
+        if method == "POST" and path == "/api/eval":
+            content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+            expr = _extract_expr(content_type, raw)
+            if expr is None:
+                return _json_response(
+                    HTTPStatus.BAD_REQUEST, {"ok": False, "error": "Missing 'expr'"}, origin
+                )
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(_POOL, evaluate, expr)
+            except CalculatorError as e:
+                return _json_response(HTTPStatus.OK, {"ok": False, "error": str(e)}, origin)
+            except Exception:
+                return _json_response(
+                    HTTPStatus.INTERNAL_SERVER_ERROR, {"ok": False, "error": "Server error"}, origin
+                )
+            return _json_response(HTTPStatus.OK, {"ok": True, "result": result}, origin)
+
+    if method == "GET" and path in {"/", "/calculator.html"}:
+        if _HTML_BYTES is None:
+            return _response(
+                HTTPStatus.NOT_FOUND,
+                b"Missing calculator.html next to web_calculator.py",
+                "text/plain; charset=utf-8",
+            )
+        return _response(HTTPStatus.OK, _HTML_BYTES, "text/html; charset=utf-8")
+
+    return _response(HTTPStatus.NOT_FOUND, b"Not found", "text/plain; charset=utf-8")
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            try:
+                block = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            request_line, _, header_block = block.partition(b"\r\n")
+            parts = request_line.decode("latin-1").split()
+            if len(parts) != 3:
+                writer.write(_response(HTTPStatus.BAD_REQUEST, b"Bad request", "text/plain"))
+                return
+            method, path, _version = parts
+            headers = _parse_headers(header_block)
+
+            length = int(headers.get("content-length", "0") or "0")
+            raw = await reader.readexactly(length) if length > 0 else b""
+
+            writer.write(await _dispatch(method, path, headers, raw))
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                return
+    except ConnectionResetError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _serve(host: str, port: int) -> None:
+    server = await asyncio.start_server(_handle, host, port)
+    print(f"Open http://{host}:{port}/ in your browser")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: list[str]) -> int:
+    host = "127.0.0.1"
+    port = 8000
+    if len(argv) >= 2:
+        try:
+            port = int(argv[1])
+        except ValueError:
+            print("Usage: python async_web_calculator.py [port]", file=sys.stderr)
+            return 2
+
+    try:
+        asyncio.run(_serve(host, port))
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,588 @@
+from __future__ import annotations
+
+import array
+import ast
+import functools
+import math
+import operator
+import sys
+import threading
+from dataclasses import dataclass
+from types import CodeType
+from typing import Any, Callable
+
+try:
+    import numexpr
+    import numpy
+except ImportError:
+    numexpr = None
+    numpy = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+class CalculatorError(Exception):
+    pass
+
+
+_BIN_OPS: dict[type[ast.operator], Callable[[float, float], float]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPS: dict[type[ast.unaryop], Callable[[float], float]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+# round() is the one whitelisted function that returns int (and the one the
+# folder must leave alone so ndigits stays an integer); keep its result in the
+# float domain so no int can ever reach ** at runtime.
+def _round(*args: float) -> float:
+    return float(round(*args))
+
+
+_round.__name__ = "round"  # keeps 'Bad arguments for round()' messages intact
+
+
+_FUNCS: dict[str, Callable[..., float]] = {
+    "abs": abs,
+    "round": _round,
+    "sqrt": math.sqrt,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "asin": math.asin,
+    "acos": math.acos,
+    "atan": math.atan,
+    "log": math.log,
+    "log10": math.log10,
+    "ln": math.log,
+    "exp": math.exp,
+    "floor": math.floor,
+    "ceil": math.ceil,
+}
+
+_CONSTS: dict[str, float] = {
+    "pi": math.pi,
+    "e": math.e,
+    "tau": math.tau,
+}
+
+
+# Pure functions that are safe to evaluate ahead of time on constant arguments.
+_FOLDABLE_FUNCS = frozenset(
+    {"abs", "sqrt", "sin", "cos", "tan", "log", "log10", "ln", "exp", "floor", "ceil"}
+)
+
+
+def _is_const_number(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) and isinstance(node.value, (int, float))
+
+
+class _Folder(ast.NodeTransformer):
+    def __init__(self, extra_names: frozenset[str] = frozenset()) -> None:
+        self.extra_names = extra_names
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in _CONSTS:
+            return ast.copy_location(ast.Constant(value=_CONSTS[node.id]), node)
+        if node.id in self.extra_names:
+            return node
+        raise CalculatorError(f"Unknown name: {node.id!r}")
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(node)
+        op_type = type(node.op)
+        if op_type in _UNARY_OPS and _is_const_number(node.operand):
+            value = _UNARY_OPS[op_type](float(node.operand.value))
+            return ast.copy_location(ast.Constant(value=value), node)
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        op_type = type(node.op)
+        if (
+            op_type in _BIN_OPS
+            and _is_const_number(node.left)
+            and _is_const_number(node.right)
+        ):
+            try:
+                value = _BIN_OPS[op_type](float(node.left.value), float(node.right.value))
+            except ArithmeticError:
+                pass
+            else:
+                return ast.copy_location(ast.Constant(value=value), node)
+        if op_type is ast.Pow:
+            # Keep exponentiation in the float domain: compiled int ** int is
+            # arbitrary precision, so an exponent whose fold overflowed above
+            # would grind out a billion-digit integer at eval time instead of
+            # raising OverflowError. Other operators keep their int constants
+            # so calls like round(x, 2) still see an integer ndigits.
+            for side in ("left", "right"):
+                operand = getattr(node, side)
+                if isinstance(operand, ast.Constant) and isinstance(operand.value, int):
+                    setattr(
+                        node,
+                        side,
+                        ast.copy_location(ast.Constant(value=float(operand.value)), operand),
+                    )
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        # Visit the arguments but not the function name: sqrt in sqrt(9) is a
+        # call target, not a value, and must survive the Name rewrite above.
+        node.args = [self.visit(arg) for arg in node.args]
+        if (
+            isinstance(node.func, ast.Name)
+            and node.func.id in _FOLDABLE_FUNCS
+            and not node.keywords
+            and all(_is_const_number(arg) for arg in node.args)
+        ):
+            try:
+                value = _FUNCS[node.func.id](*(float(arg.value) for arg in node.args))
+            except (ArithmeticError, ValueError, TypeError):
+                return node
+            return ast.copy_location(ast.Constant(value=value), node)
+        return node
+
+
+def _fold(tree: ast.Expression, extra_names: frozenset[str] = frozenset()) -> ast.Expression:
+    return ast.fix_missing_locations(_Folder(extra_names).visit(tree))
+
+
+class _Validator(ast.NodeVisitor):
+    def __init__(self, extra_names: frozenset[str] = frozenset()) -> None:
+        self.extra_names = extra_names
+
+    def visit_Expression(self, node: ast.Expression) -> None:
+        self.visit(node.body)
+
+    def visit_Constant(self, node: ast.Constant) -> None:
+        if not isinstance(node.value, (int, float)):
+            raise CalculatorError("Only numbers are allowed")
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if node.id not in _CONSTS and node.id not in self.extra_names:
+            raise CalculatorError(f"Unknown name: {node.id!r}")
+
+    def visit_BinOp(self, node: ast.BinOp) -> None:
+        if type(node.op) not in _BIN_OPS:
+            raise CalculatorError(f"Operator not allowed: {type(node.op).__name__}")
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> None:
+        if type(node.op) not in _UNARY_OPS:
+            raise CalculatorError(f"Unary operator not allowed: {type(node.op).__name__}")
+        self.visit(node.operand)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if not isinstance(node.func, ast.Name):
+            raise CalculatorError("Only simple function calls are allowed, e.g. sqrt(9)")
+        if node.func.id not in _FUNCS:
+            raise CalculatorError(f"Unknown function: {node.func.id!r}")
+        if node.keywords:
+            raise CalculatorError("Keyword arguments are not supported")
+        for arg in node.args:
+            self.visit(arg)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        raise CalculatorError(f"Expression not supported: {type(node).__name__}")
+
+
+# Environment the compiled code objects run in: whitelisted callables and
+# constants only, with builtins cut off.
+_SAFE_ENV: dict[str, Any] = {**_FUNCS, **_CONSTS}
+_EMPTY_GLOBALS: dict[str, Any] = {"__builtins__": {}}
+
+
+def _node_key(node: ast.AST) -> Any:
+    # Structural identity of a subtree; None means "do not CSE this node".
+    if isinstance(node, ast.Expression):
+        return _node_key(node.body)
+    if isinstance(node, ast.Constant):
+        return ("const", node.value)
+    if isinstance(node, ast.Name):
+        return ("name", node.id)
+    if isinstance(node, ast.BinOp):
+        left = _node_key(node.left)
+        right = _node_key(node.right)
+        if left is None or right is None:
+            return None
+        return (type(node.op).__name__, left, right)
+    if isinstance(node, ast.UnaryOp):
+        operand = _node_key(node.operand)
+        if operand is None:
+            return None
+        return (type(node.op).__name__, operand)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        args = tuple(_node_key(arg) for arg in node.args)
+        if None in args:
+            return None
+        return ("call", node.func.id, args)
+    return None
+
+
+# Opcodes for the register programs produced by _batch_compile. Instructions
+# name their operand registers instead of using a stack; each register is one
+# contiguous float64 column (an array.array("d") of the batch length), so the
+# batch evaluator runs one tight loop per instruction rather than a full
+# expression walk per point.
+_R_CONST = 0
+_R_BIN = 1
+_R_UNARY = 2
+_R_CALL1 = 3
+_R_CALL2 = 4
+_R_CALLN = 5
+
+
+def _batch_emit(
+    node: ast.AST,
+    code: list[tuple[Any, ...]],
+    slots: dict[Any, int],
+    n_regs: list[int],
+) -> int:
+    key = _node_key(node)
+    if key is not None and key in slots:
+        return slots[key]
+
+    if isinstance(node, ast.Expression):
+        return _batch_emit(node.body, code, slots, n_regs)
+
+    dst = n_regs[0]
+    n_regs[0] += 1
+
+    if isinstance(node, ast.Constant):
+        if not isinstance(node.value, (int, float)):
+            raise CalculatorError("Only numbers are allowed")
+        code.append((_R_CONST, dst, float(node.value)))
+    elif isinstance(node, ast.Name):
+        if node.id not in _CONSTS:
+            raise CalculatorError(f"Unknown name: {node.id!r}")
+        code.append((_R_CONST, dst, _CONSTS[node.id]))
+    elif isinstance(node, ast.BinOp):
+        op_type = type(node.op)
+        if op_type not in _BIN_OPS:
+            raise CalculatorError(f"Operator not allowed: {op_type.__name__}")
+        left = _batch_emit(node.left, code, slots, n_regs)
+        right = _batch_emit(node.right, code, slots, n_regs)
+        code.append((_R_BIN, dst, _BIN_OPS[op_type], left, right))
+    elif isinstance(node, ast.UnaryOp):
+        op_type = type(node.op)
+        if op_type not in _UNARY_OPS:
+            raise CalculatorError(f"Unary operator not allowed: {op_type.__name__}")
+        operand = _batch_emit(node.operand, code, slots, n_regs)
+        code.append((_R_UNARY, dst, _UNARY_OPS[op_type], operand))
+    elif isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name):
+            raise CalculatorError("Only simple function calls are allowed, e.g. sqrt(9)")
+        name = node.func.id
+        if name not in _FUNCS:
+            raise CalculatorError(f"Unknown function: {name!r}")
+        if node.keywords:
+            raise CalculatorError("Keyword arguments are not supported")
+        srcs = [_batch_emit(arg, code, slots, n_regs) for arg in node.args]
+        fn = _FUNCS[name]
+        if len(srcs) == 1:
+            code.append((_R_CALL1, dst, fn, srcs[0]))
+        elif len(srcs) == 2:
+            code.append((_R_CALL2, dst, fn, srcs[0], srcs[1]))
+        else:
+            code.append((_R_CALLN, dst, fn, *srcs))
+    else:
+        raise CalculatorError(f"Expression not supported: {type(node).__name__}")
+
+    # Registers are never overwritten, so any keyed subtree can be reused by
+    # later occurrences without a separate counting pass.
+    if key is not None:
+        slots[key] = dst
+    return dst
+
+
+def _batch_compile(
+    node: ast.AST, params: tuple[str, ...]
+) -> tuple[list[tuple[Any, ...]], int, int]:
+    # The first len(params) registers are the input columns, in params order.
+    slots: dict[Any, int] = {("name", name): i for i, name in enumerate(params)}
+    code: list[tuple[Any, ...]] = []
+    n_regs = [len(params)]
+    out = _batch_emit(node, code, slots, n_regs)
+    return code, out, n_regs[0]
+
+
+def _batch_run(code: list[tuple[Any, ...]], regs: list[array.array], n: int) -> None:
+    rng = range(n)
+    ins: tuple[Any, ...] = ()
+    try:
+        for ins in code:
+            op = ins[0]
+            if op == _R_BIN or op == _R_CALL2:
+                _, dst, fn, a, b = ins
+                d, ra, rb = regs[dst], regs[a], regs[b]
+                for i in rng:
+                    d[i] = fn(ra[i], rb[i])
+            elif op == _R_UNARY or op == _R_CALL1:
+                _, dst, fn, a = ins
+                d, ra = regs[dst], regs[a]
+                for i in rng:
+                    d[i] = fn(ra[i])
+            elif op == _R_CONST:
+                regs[ins[1]] = array.array("d", [ins[2]]) * n
+            else:
+                _, dst, fn = ins[:3]
+                d = regs[dst]
+                srcs = [regs[s] for s in ins[3:]]
+                for i in rng:
+                    d[i] = fn(*(s[i] for s in srcs))
+    except ZeroDivisionError as e:
+        raise CalculatorError("Division by zero") from e
+    except OverflowError as e:
+        raise CalculatorError("Result too large") from e
+    except ValueError as e:
+        raise CalculatorError(str(e)) from e
+    except TypeError as e:
+        raise CalculatorError(f"Bad arguments for {ins[2].__name__}()") from e
+
+
+# 3.13+ can run CPython's own constant folder while parsing, which prunes
+# idioms like a literal `-1` (folded straight into a Constant) before our own
+# float-domain _fold pass even sees the tree. Probe once instead of paying a
+# TypeError per parse on older interpreters.
+try:
+    ast.parse("0", mode="eval", optimize=2)
+    _PARSE_KWARGS: dict[str, Any] = {"optimize": 2}
+except TypeError:
+    _PARSE_KWARGS = {}
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_cached(expr: str) -> ast.Expression:
+    try:
+        tree = ast.parse(expr, mode="eval", **_PARSE_KWARGS)
+    except SyntaxError as e:
+        raise CalculatorError("Invalid expression") from e
+    return _fold(tree)
+
+
+# Expressions that keep being evaluated get promoted to a Numba-compiled
+# native function in the background; until (and unless) that lands, the
+# compiled-code-object path below serves every call.
+_JIT_THRESHOLD = 2
+
+_jit_lock = threading.Lock()
+_jit_hits: dict[str, int] = {}
+_jit_fns: dict[str, Callable[..., float] | None] = {}
+_jit_pending: set[str] = set()
+
+
+def _jit_key(expr: str, params: tuple[str, ...]) -> str:
+    return f"{expr}|{','.join(params)}" if params else expr
+
+
+def _jit_build(tree: ast.Expression, params: tuple[str, ...]) -> Callable[..., float]:
+    src = f"def _f({', '.join(params)}):\n    return {ast.unparse(tree)}"
+    ns: dict[str, Any] = dict(_SAFE_ENV)
+    exec(compile(src, "<jit>", "exec"), ns)
+    fn = numba.njit(cache=True, fastmath=True)(ns["_f"])
+    fn(*(0.0 for _ in params))  # force compilation here, off the serving path
+    return fn
+
+
+def _jit_worker(key: str, tree: ast.Expression, params: tuple[str, ...]) -> None:
+    try:
+        fn = _jit_build(tree, params)
+    except Exception:
+        fn = None  # remember the failure so the expression is not retried
+    with _jit_lock:
+        _jit_pending.discard(key)
+        _jit_fns[key] = fn
+
+
+def _maybe_jit(expr: str, tree: ast.Expression, params: tuple[str, ...] = ()) -> None:
+    key = _jit_key(expr, params)
+    with _jit_lock:
+        if len(_jit_hits) > 4096:
+            _jit_hits.clear()
+        hits = _jit_hits.get(key, 0) + 1
+        _jit_hits[key] = hits
+        if hits < _JIT_THRESHOLD or key in _jit_fns or key in _jit_pending:
+            return
+        _jit_pending.add(key)
+    threading.Thread(target=_jit_worker, args=(key, tree, params), daemon=True).start()
+
+
+@functools.lru_cache(maxsize=1024)
+def _code_cached(expr: str) -> CodeType:
+    tree = _parse_cached(expr)
+    _Validator().visit(tree)
+    return compile(tree, "<expr>", "eval")
+
+
+def evaluate(expr: str) -> float:
+    if numba is not None:
+        fn = _jit_fns.get(expr)
+        if fn is not None:
+            try:
+                return float(fn())
+            except Exception:
+                pass  # fall back to the interpreter for its error handling
+
+    code = _code_cached(expr)
+    try:
+        result = eval(code, _EMPTY_GLOBALS, _SAFE_ENV)
+        if not isinstance(result, float):
+            result = float(result)
+    except ZeroDivisionError as e:
+        raise CalculatorError("Division by zero") from e
+    except OverflowError as e:
+        raise CalculatorError("Result too large") from e
+    except ValueError as e:
+        raise CalculatorError(str(e)) from e
+    except TypeError as e:
+        raise CalculatorError(str(e)) from e
+    if numba is not None:
+        _maybe_jit(expr, _parse_cached(expr))
+    return result
+
+
+def evaluate_batch(expr: str, variables: dict[str, list[float]]) -> list[float]:
+    for name, values in variables.items():
+        if not isinstance(name, str) or not name.isidentifier():
+            raise CalculatorError(f"Bad variable name: {name!r}")
+        if name in _CONSTS or name in _FUNCS:
+            raise CalculatorError(f"Variable name not allowed: {name!r}")
+        if not isinstance(values, list) or not all(
+            isinstance(v, (int, float)) for v in values
+        ):
+            raise CalculatorError(f"Variable {name!r} must be a list of numbers")
+
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError as e:
+        raise CalculatorError("Invalid expression") from e
+    names = frozenset(variables)
+    tree = _fold(tree, extra_names=names)
+    _Validator(extra_names=names).visit(tree)
+
+    lengths = {len(values) for values in variables.values()}
+    if len(lengths) > 1:
+        raise CalculatorError("All variable lists must have the same length")
+    n = lengths.pop() if lengths else 1
+
+    params = tuple(sorted(variables))
+    if numba is not None:
+        fn = _jit_fns.get(_jit_key(expr, params))
+        if fn is not None:
+            try:
+                if params:
+                    columns = [variables[name] for name in params]
+                    return [float(fn(*point)) for point in zip(*columns)]
+                return [float(fn())] * n
+            except Exception:
+                pass
+
+    if numexpr is not None:
+        # One parse + vectorized kernels over the whole array instead of n
+        # scalar evaluations; fall through on anything numexpr cannot take
+        # (e.g. function names it does not know).
+        try:
+            arrays = {
+                name: numpy.asarray(values, dtype=numpy.float64)
+                for name, values in variables.items()
+            }
+            result = numexpr.evaluate(expr, local_dict=arrays, global_dict=dict(_CONSTS))
+            result = numpy.asarray(result, dtype=numpy.float64)
+            return numpy.broadcast_to(result, (n,)).tolist()
+        except Exception:
+            pass
+
+    # Struct-of-arrays register kernel: the expression is compiled once into
+    # instructions over contiguous float64 columns, so each point costs one
+    # inner-loop iteration per node instead of a full eval() of a code object.
+    code, out_reg, n_regs = _batch_compile(tree, params)
+    regs: list[array.array] = [array.array("d", variables[name]) for name in params]
+    regs.extend(array.array("d", bytes(8 * n)) for _ in range(n_regs - len(params)))
+    _batch_run(code, regs, n)
+    out = regs[out_reg].tolist()
+    if numba is not None:
+        _maybe_jit(expr, tree, params)
+    return out
+
+
+@dataclass
+class ReplState:
+    last: float | None = None
+    # str(last) kept alongside, refreshed only when last changes, so the REPL
+    # loop does not re-stringify the same float on every line.
+    last_str: str = "0"
+
+
+def repl() -> int:
+    state = ReplState()
+    print("Python Calculator (safe)")
+    print("Examples: 2+3*4, (1+2)**3, sqrt(9), sin(pi/2)")
+    print("Constants: pi, e, tau")
+    print("Commands: :q (quit), :h (help), :c (clear last)")
+    while True:
+        try:
+            line = input("> ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            return 0
+
+        if not line:
+            continue
+        if line in {":q", "q", "quit", "exit"}:
+            return 0
+        if line in {":h", "help", "?"}:
+            print("Enter a math expression.")
+            print("Allowed: + - * / % ** ( ) and functions like sqrt(x), log(x, base).")
+            print("Use '_' to refer to the previous result.")
+            continue
+        if line in {":c", "clear"}:
+            state.last = None
+            state.last_str = "0"
+            print("Cleared.")
+            continue
+
+        expr = line.replace("_", state.last_str) if "_" in line else line
+        try:
+            value = evaluate(expr)
+        except CalculatorError as e:
+            print(f"Error: {e}")
+            continue
+
+        state.last = value
+        state.last_str = str(value)
+        if value.is_integer():
+            print(int(value))
+        else:
+            print(value)
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) <= 1:
+        return repl()
+    expr = " ".join(argv[1:])
+    try:
+        value = evaluate(expr)
+    except CalculatorError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if value.is_integer():
+        print(int(value))
+    else:
+        print(value)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
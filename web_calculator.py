@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import functools
+import gzip
+import json
+import os
+import re
+import sys
+import urllib.parse
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from calculator import CalculatorError, evaluate, evaluate_batch
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+ROOT = Path(__file__).resolve().parent
+HTML_PATH = ROOT / "calculator.html"
+
+
+if orjson is not None:
+    _dumps = orjson.dumps
+else:
+    def _dumps(payload: dict) -> bytes:
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+# Fixed payloads on the hot path, encoded once.
+_RESP_HEALTH = _dumps({"ok": True})
+_RESP_BAD_JSON = _dumps({"ok": False, "error": "Bad JSON"})
+_RESP_MISSING_EXPR = _dumps({"ok": False, "error": "Missing 'expr'"})
+_RESP_SERVER_ERROR = _dumps({"ok": False, "error": "Server error"})
+
+_LEN_STRS = {n: str(n) for n in range(256)}
+
+# The calculator UI sends exactly {"expr": "..."}; when the body matches this
+# shape (no escapes), the expression can be cut out without running the full
+# JSON parser.
+_SIMPLE_JSON_EXPR = re.compile(rb'\A\s*\{\s*"expr"\s*:\s*"([^"\\]*)"\s*\}\s*\Z')
+
+
+def _read_text(path: Path) -> str:
+    return path.read_text(encoding="utf-8")
+
+
+# The calculator page never changes while the server runs, so encode (and
+# compress) it once at import time instead of on every GET.
+if HTML_PATH.exists():
+    _HTML_BYTES: bytes | None = HTML_PATH.read_bytes()
+    _HTML_GZ: bytes | None = gzip.compress(_HTML_BYTES, 6)
+    _HTML_ETAG: str | None = f'"{HTML_PATH.stat().st_mtime_ns:x}-{len(_HTML_BYTES):x}"'
+else:
+    _HTML_BYTES = None
+    _HTML_GZ = None
+    _HTML_ETAG = None
+
+
+@functools.lru_cache(maxsize=32)
+def _cors_bytes(origin: str) -> bytes:
+    return (
+        f"Access-Control-Allow-Origin: {origin}\r\n"
+        "Vary: Origin\r\n"
+        "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+        "Access-Control-Allow-Headers: Content-Type\r\n"
+    ).encode("latin-1")
+
+
+class Handler(BaseHTTPRequestHandler):
+    def end_headers(self) -> None:
+        if self.path.startswith("/api/"):
+            # The UI hits the API with one (or very few) distinct Origins, so
+            # the four CORS headers are composed once per Origin and appended
+            # as a single preformatted block.
+            if not hasattr(self, "_headers_buffer"):
+                self._headers_buffer = []
+            self._headers_buffer.append(_cors_bytes(self.headers.get("Origin") or "*"))
+        super().end_headers()
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        self._send_json_bytes(status, _dumps(payload))
+
+    def _send_json_bytes(self, status: int, data: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", _LEN_STRS.get(len(data)) or str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_text(self, status: int, text: str, content_type: str) -> None:
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_bytes(
+        self,
+        status: int,
+        data: bytes,
+        content_type: str,
+        extra_headers: tuple[tuple[str, str], ...] = (),
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in extra_headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(memoryview(data))
+
+    def do_GET(self) -> None:
+        if self.path in {"/", "/calculator.html"}:
+            if _HTML_BYTES is None:
+                # File was missing at startup; fall back to a live read so a
+                # restart is not required just to drop the page in place.
+                if HTML_PATH.exists():
+                    self._send_text(HTTPStatus.OK, _read_text(HTML_PATH), "text/html")
+                    return
+                self._send_text(
+                    HTTPStatus.NOT_FOUND,
+                    "Missing calculator.html next to web_calculator.py",
+                    "text/plain",
+                )
+                return
+            if self.headers.get("If-None-Match") == _HTML_ETAG:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", _HTML_ETAG)
+                self.end_headers()
+                return
+            if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                self._send_bytes(
+                    HTTPStatus.OK,
+                    _HTML_GZ,
+                    "text/html; charset=utf-8",
+                    (("ETag", _HTML_ETAG), ("Content-Encoding", "gzip")),
+                )
+            else:
+                self._send_bytes(
+                    HTTPStatus.OK,
+                    _HTML_BYTES,
+                    "text/html; charset=utf-8",
+                    (("ETag", _HTML_ETAG),),
+                )
+            return
+
+        if self.path == "/api/health":
+            self._send_json_bytes(HTTPStatus.OK, _RESP_HEALTH)
+            return
+
+        self._send_text(HTTPStatus.NOT_FOUND, "Not found", "text/plain")
+
+    def do_OPTIONS(self) -> None:
+        if not self.path.startswith("/api/"):
+            self._send_text(HTTPStatus.NOT_FOUND, "Not found", "text/plain")
+            return
+        self.send_response(HTTPStatus.NO_CONTENT)
+        self.end_headers()
+
+    def _do_eval_batch(self) -> None:
+        length = int(self.headers.get("Content-Length", "0") or "0")
+        raw = self.rfile.read(length) if length > 0 else b""
+        try:
+            obj = json.loads(raw.decode("utf-8") if raw else "{}")
+        except json.JSONDecodeError:
+            self._send_json_bytes(HTTPStatus.BAD_REQUEST, _RESP_BAD_JSON)
+            return
+
+        expr = obj.get("expr") if isinstance(obj, dict) else None
+        variables = obj.get("vars", {}) if isinstance(obj, dict) else None
+        if not isinstance(expr, str) or not isinstance(variables, dict):
+            self._send_json_bytes(HTTPStatus.BAD_REQUEST, _RESP_MISSING_EXPR)
+            return
+
+        try:
+            result = evaluate_batch(expr, variables)
+        except CalculatorError as e:
+            self._send_json(HTTPStatus.OK, {"ok": False, "error": str(e)})
+            return
+        except Exception:
+            self._send_json_bytes(HTTPStatus.INTERNAL_SERVER_ERROR, _RESP_SERVER_ERROR)
+            return
+        self._send_json(HTTPStatus.OK, {"ok": True, "result": result})
+
+    def do_POST(self) -> None:
+        if self.path == "/api/eval_batch":
+            self._do_eval_batch()
+            return
+        if self.path != "/api/eval":
+            self._send_text(HTTPStatus.NOT_FOUND, "Not found", "text/plain")
+            return
+
+        length = int(self.headers.get("Content-Length", "0") or "0")
+        raw = self.rfile.read(length) if length > 0 else b""
+
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        expr = None
+
+        if content_type == "application/json":
+            match = _SIMPLE_JSON_EXPR.match(raw)
+            if match is not None:
+                expr = match.group(1).decode("utf-8")
+            else:
+                try:
+                    obj = json.loads(raw.decode("utf-8") if raw else "{}")
+                except json.JSONDecodeError:
+                    self._send_json_bytes(HTTPStatus.BAD_REQUEST, _RESP_BAD_JSON)
+                    return
+                if isinstance(obj, dict):
+                    value = obj.get("expr")
+                    if isinstance(value, str):
+                        expr = value
+        elif content_type == "application/x-www-form-urlencoded":
+            if raw.startswith(b"expr=") and b"&" not in raw:
+                # Single-field form post: skip the dict/list machinery of
+                # parse_qs entirely.
+                expr = urllib.parse.unquote_plus(raw[5:].decode("utf-8"))
+            else:
+                parsed = urllib.parse.parse_qs(raw.decode("utf-8"), keep_blank_values=True)
+                value = parsed.get("expr", [None])[0]
+                if isinstance(value, str):
+                    expr = value
+
+        if expr is None:
+            self._send_json_bytes(HTTPStatus.BAD_REQUEST, _RESP_MISSING_EXPR)
+            return
+
+        try:
+            result = evaluate(expr)
+        except CalculatorError as e:
+            self._send_json(HTTPStatus.OK, {"ok": False, "error": str(e)})
+            return
+        except Exception:
+            self._send_json_bytes(HTTPStatus.INTERNAL_SERVER_ERROR, _RESP_SERVER_ERROR)
+            return
+
+        self._send_json(HTTPStatus.OK, {"ok": True, "result": result})
+
+    def log_message(self, fmt: str, *args: object) -> None:
+        if os.environ.get("CALC_WEB_QUIET") == "1":
+            return
+        super().log_message(fmt, *args)
+
+
+def main(argv: list[str]) -> int:
+    host = "127.0.0.1"
+    port = 8000
+    if len(argv) >= 2:
+        try:
+            port = int(argv[1])
+        except ValueError:
+            print("Usage: python web_calculator.py [port]", file=sys.stderr)
+            return 2
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    print(f"Open http://{host}:{port}/ in your browser")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping...")
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))